@@ -18,5 +18,7 @@ echo "$(date): Starting Nexus_3 API on port 8100" >> logs/nexus.log
 exec uv run uvicorn nexus.app:app \
     --host 0.0.0.0 \
     --port 8100 \
+    --loop uvloop \
+    --http httptools \
     --no-access-log \
     --log-level info
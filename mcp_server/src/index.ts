@@ -68,7 +68,8 @@ const TOOLS = [
         },
         limit: {
           type: 'number',
-          default: 10
+          default: 10,
+          maximum: 1000
         }
       }
     }
@@ -163,7 +164,7 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
         if (args?.limit) params.append('limit', String(args.limit));
         
         const response = await axios.get(`${NEXUS_API_URL}/tasks?${params}`);
-        const tasks = response.data;
+        const tasks = response.data.tasks;
         
         const taskList = tasks.map((t: any) => 
           `- ${t.id} [${t.type}]: ${t.description} (${t.status})`
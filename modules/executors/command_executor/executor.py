@@ -1,17 +1,23 @@
 """Command Executor Module - Executes system commands"""
 import os
 import subprocess
-import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from pathlib import Path
+from typing import Dict, Any
 import shlex
+from functools import lru_cache
 
 from nexus.modules.base import BaseModule
+from nexus.modules.exec_core import run_cmd, output_fields
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _split(command: str) -> tuple:
+    """Tokenize a command string, memoized for commands that recur"""
+    return tuple(shlex.split(command))
+
+
 class CommandExecutor(BaseModule):
     """Executor module that runs system commands"""
     
@@ -21,7 +27,10 @@ class CommandExecutor(BaseModule):
         self.max_timeout = self.config.get('max_timeout', 3600)
         self.capture_output = self.config.get('capture_output', True)
         self.use_shell = self.config.get('shell', False)
-        logger.info(f"Command executor initialized with timeout={self.default_timeout}s")
+        self._base_env = os.environ.copy()
+        logger.info(
+            f"Command executor initialized with timeout={self.default_timeout}s"
+        )
     
     async def teardown(self):
         """Clean up resources"""
@@ -37,6 +46,8 @@ class CommandExecutor(BaseModule):
         - working_directory: str - Working directory (optional)
         - environment: Dict[str, str] - Environment variables (optional)
         - capture_output: bool - Whether to capture output (optional)
+        - binary_output: bool - Return raw stdout_bytes/stderr_bytes instead
+          of decoded stdout/stderr (optional)
         """
         # Extract command
         command = context.get('command')
@@ -48,7 +59,7 @@ class CommandExecutor(BaseModule):
             if self.use_shell:
                 cmd = command
             else:
-                cmd = shlex.split(command)
+                cmd = list(_split(command))
         else:
             cmd = command
         
@@ -67,106 +78,68 @@ class CommandExecutor(BaseModule):
         )
         working_dir = context.get('working_directory', os.getcwd())
         capture = context.get('capture_output', self.capture_output)
+        binary = context.get('binary_output', False)
         
         # Prepare environment
-        env = os.environ.copy()
         custom_env = context.get('environment', {})
-        if custom_env:
-            env.update(custom_env)
+        env = {**self._base_env, **custom_env} if custom_env else self._base_env
         
         # Log execution details
-        logger.info(f"Executing command: {cmd}")
-        logger.debug(f"Working directory: {working_dir}")
-        logger.debug(f"Timeout: {timeout}s")
+        logger.info("Executing command: %s", cmd)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Working directory: %s", working_dir)
+            logger.debug("Timeout: %ss", timeout)
         
         # Execute command
         try:
-            if asyncio.get_event_loop().is_running():
-                # Async execution
-                result = await self._execute_async(
-                    cmd, working_dir, env, timeout, capture
-                )
-            else:
-                # Sync execution fallback
-                result = self._execute_sync(
-                    cmd, working_dir, env, timeout, capture
-                )
-            
-            return result
+            return await self._execute_async(
+                cmd, working_dir, env, timeout, capture, binary
+            )
             
         except subprocess.TimeoutExpired as e:
-            logger.error(f"Command timed out after {timeout}s")
+            logger.error("Command timed out after %ss", timeout)
             return {
                 "success": False,
                 "exit_code": -1,
                 "error": f"Command timed out after {timeout} seconds",
-                "stdout": e.stdout.decode() if e.stdout else "",
-                "stderr": e.stderr.decode() if e.stderr else "",
+                **output_fields(e.stdout, e.stderr, binary),
                 "timed_out": True
             }
         except Exception as e:
-            logger.error(f"Command execution failed: {e}")
+            logger.error("Command execution failed: %s", e)
             return {
                 "success": False,
                 "exit_code": -1,
                 "error": str(e),
-                "stdout": "",
-                "stderr": "",
+                **output_fields(b"", b"", binary),
                 "timed_out": False
             }
     
-    async def _execute_async(self, cmd, working_dir, env, timeout, capture):
-        """Execute command asynchronously"""
-        if self.use_shell and isinstance(cmd, list):
-            cmd = ' '.join(cmd)
+    async def _execute_async(self, cmd, working_dir, env, timeout, capture, binary):
+        """Execute command asynchronously through the shared run_cmd path"""
+        if self.use_shell:
+            if isinstance(cmd, list):
+                cmd = ' '.join(cmd)
+        elif isinstance(cmd, str):
+            cmd = [cmd]
         
-        proc = await asyncio.create_subprocess_shell(
-            cmd if self.use_shell else None,
-            *cmd if not self.use_shell else [],
-            stdout=asyncio.subprocess.PIPE if capture else None,
-            stderr=asyncio.subprocess.PIPE if capture else None,
-            cwd=working_dir,
-            env=env
+        res = await run_cmd(
+            cmd, env=env, cwd=working_dir, timeout=timeout,
+            capture=capture, shell=self.use_shell
         )
-        
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(),
-                timeout=timeout
+        if res.timed_out:
+            raise subprocess.TimeoutExpired(
+                cmd, timeout, output=res.stdout, stderr=res.stderr
             )
-            
-            return {
-                "success": proc.returncode == 0,
-                "exit_code": proc.returncode,
-                "stdout": stdout.decode() if stdout else "",
-                "stderr": stderr.decode() if stderr else "",
-                "error": None if proc.returncode == 0 else f"Process exited with code {proc.returncode}",
-                "timed_out": False
-            }
-            
-        except asyncio.TimeoutError:
-            proc.kill()
-            await proc.wait()
-            raise subprocess.TimeoutExpired(cmd, timeout)
-    
-    def _execute_sync(self, cmd, working_dir, env, timeout, capture):
-        """Execute command synchronously"""
-        result = subprocess.run(
-            cmd,
-            cwd=working_dir,
-            env=env,
-            capture_output=capture,
-            text=True,
-            timeout=timeout,
-            shell=self.use_shell
-        )
         
         return {
-            "success": result.returncode == 0,
-            "exit_code": result.returncode,
-            "stdout": result.stdout if capture else "",
-            "stderr": result.stderr if capture else "",
-            "error": None if result.returncode == 0 else f"Process exited with code {result.returncode}",
+            "success": res.success,
+            "exit_code": res.exit_code,
+            **output_fields(res.stdout, res.stderr, binary),
+            "error": (
+                None if res.success
+                else f"Process exited with code {res.exit_code}"
+            ),
             "timed_out": False
         }
 
@@ -1,26 +1,39 @@
 """Command Executor Module - Executes system commands"""
 import asyncio
-import subprocess
 import os
-import time
 import logging
-from typing import Dict, Any, List, Optional
+import shlex
+import signal
+from typing import Dict, Any, List, Set
 from datetime import datetime
 
 from nexus.modules.base import ExecutorModule, ModuleManifest
+from nexus.modules.exec_core import run_cmd, output_fields, signal_process_group
 
 logger = logging.getLogger(__name__)
 
+def _params(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Execution parameters of a task
+    
+    Queued tasks carry them in task['parameters']; direct callers may pass
+    them at the top level of the task dict.
+    """
+    return task.get('parameters') or task
+
 class Module(ExecutorModule):
     """Command executor that runs system commands and scripts"""
     
     def __init__(self, manifest: ModuleManifest):
         super().__init__(manifest)
-        self.active_processes: Dict[str, subprocess.Popen] = {}
+        self.active_processes: Dict[str, asyncio.subprocess.Process] = {}
+        self._watchers: Set[asyncio.Task] = set()
         
     async def initialize(self) -> bool:
         """Initialize the command executor"""
         logger.info(f"Initializing {self.name}")
+        # Snapshot the environment once; tasks only pay for a copy when they
+        # add their own variables
+        self._base_env = os.environ.copy()
         return True
     
     async def shutdown(self) -> bool:
@@ -28,14 +41,14 @@ class Module(ExecutorModule):
         logger.info(f"Shutting down {self.name}")
         
         # Terminate any active processes
-        for task_id, process in self.active_processes.items():
-            if process.poll() is None:  # Process still running
+        for task_id, process in list(self.active_processes.items()):
+            if process.returncode is None:  # Process still running
                 logger.warning(f"Terminating active process for task {task_id}")
-                process.terminate()
+                signal_process_group(process, signal.SIGTERM)
                 try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
+                    await asyncio.wait_for(process.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    signal_process_group(process, signal.SIGKILL)
         
         self.active_processes.clear()
         return True
@@ -43,7 +56,7 @@ class Module(ExecutorModule):
     async def can_execute(self, task: Dict[str, Any]) -> bool:
         """Check if this executor can handle the task"""
         # Can execute if task has a command
-        return task.get('command') is not None
+        return _params(task).get('command') is not None
     
     async def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute based on context - delegates to execute_task"""
@@ -65,8 +78,9 @@ class Module(ExecutorModule):
             }
         
         task_id = task.get('id', 'unknown')
-        command = task.get('command')
-        args = task.get('args', [])
+        params = _params(task)
+        command = params.get('command')
+        args = params.get('args', [])
         
         if not command:
             return {
@@ -80,120 +94,89 @@ class Module(ExecutorModule):
             cmd.extend(args)
         
         # Get execution parameters
-        timeout = task.get('timeout_seconds', self.config.get('default_timeout_seconds', 300))
-        working_dir = task.get('working_directory', os.getcwd())
-        environment = task.get('environment', {})
-        capture_output = task.get('capture_output', self.config.get('capture_output', True))
-        use_shell = task.get('shell', self.config.get('shell', False))
+        timeout = params.get(
+            'timeout_seconds', self.config.get('default_timeout_seconds', 300)
+        )
+        working_dir = params.get('working_directory', os.getcwd())
+        environment = params.get('environment', {})
+        capture_output = params.get(
+            'capture_output', self.config.get('capture_output', True)
+        )
+        binary_output = params.get('binary_output', False)
+        use_shell = params.get('shell', self.config.get('shell', False))
         
         # Setup environment
-        env = os.environ.copy()
-        if environment:
-            env.update(environment)
+        env = {**self._base_env, **environment} if environment else self._base_env
         
-        logger.info(f"Executing command for task {task_id}: {' '.join(cmd)}")
+        # Build the display/shell string once. The command itself is left as
+        # written (it may use shell syntax); only the args are quoted
+        cmd_str = f"{command} {shlex.join(args)}" if args else command
+        logger.info("Executing command for task %s: %s", task_id, cmd_str)
+        
+        def track(process: asyncio.subprocess.Process):
+            # Track the process until it exits
+            self.active_processes[task_id] = process
+            watcher = asyncio.create_task(self._watch(task_id, process))
+            self._watchers.add(watcher)
+            watcher.add_done_callback(self._watchers.discard)
         
         try:
-            start_time = time.time()
-            
-            if use_shell:
-                # Join command for shell execution
-                cmd_str = ' '.join(cmd)
-                result = await asyncio.create_subprocess_shell(
-                    cmd_str,
-                    stdout=asyncio.subprocess.PIPE if capture_output else None,
-                    stderr=asyncio.subprocess.PIPE if capture_output else None,
-                    cwd=working_dir,
-                    env=env
-                )
-            else:
-                result = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdout=asyncio.subprocess.PIPE if capture_output else None,
-                    stderr=asyncio.subprocess.PIPE if capture_output else None,
-                    cwd=working_dir,
-                    env=env
-                )
-            
-            # Store process reference
-            self.active_processes[task_id] = result
-            
-            try:
-                # Wait for completion with timeout
-                stdout, stderr = await asyncio.wait_for(
-                    result.communicate(),
-                    timeout=timeout
-                )
-                
-                execution_time = time.time() - start_time
-                
-                # Decode output if captured
-                stdout_text = stdout.decode('utf-8', errors='replace') if stdout else ""
-                stderr_text = stderr.decode('utf-8', errors='replace') if stderr else ""
-                
-                # Remove from active processes
-                self.active_processes.pop(task_id, None)
-                
-                if result.returncode == 0:
-                    logger.info(f"Task {task_id} completed successfully in {execution_time:.2f}s")
-                    return {
-                        "status": "success",
-                        "exit_code": result.returncode,
-                        "stdout": stdout_text,
-                        "stderr": stderr_text,
-                        "execution_time": execution_time,
-                        "completed_at": datetime.now().isoformat()
-                    }
-                else:
-                    logger.error(f"Task {task_id} failed with exit code {result.returncode}")
-                    return {
-                        "status": "failed",
-                        "exit_code": result.returncode,
-                        "stdout": stdout_text,
-                        "stderr": stderr_text,
-                        "execution_time": execution_time,
-                        "error": f"Command exited with code {result.returncode}",
-                        "completed_at": datetime.now().isoformat()
-                    }
-                    
-            except asyncio.TimeoutError:
-                # Kill the process
-                result.terminate()
-                try:
-                    await asyncio.wait_for(result.wait(), timeout=5)
-                except asyncio.TimeoutError:
-                    result.kill()
-                    await result.wait()
-                
-                self.active_processes.pop(task_id, None)
-                
-                logger.error(f"Task {task_id} timed out after {timeout}s")
-                return {
-                    "status": "failed",
-                    "error": f"Command timed out after {timeout} seconds",
-                    "execution_time": timeout,
-                    "completed_at": datetime.now().isoformat()
-                }
-                
+            res = await run_cmd(
+                cmd_str if use_shell else cmd,
+                env=env,
+                cwd=working_dir,
+                timeout=timeout,
+                capture=capture_output,
+                shell=use_shell,
+                on_spawn=track
+            )
         except Exception as e:
-            logger.error(f"Task {task_id} execution error: {e}")
-            self.active_processes.pop(task_id, None)
+            logger.error("Task %s execution error: %s", task_id, e)
             
             return {
                 "status": "failed",
                 "error": f"Execution error: {str(e)}",
                 "completed_at": datetime.now().isoformat()
             }
+        
+        if res.timed_out:
+            logger.error("Task %s timed out after %ss", task_id, timeout)
+            return {
+                "status": "failed",
+                "error": f"Command timed out after {timeout} seconds",
+                "execution_time": timeout,
+                "completed_at": datetime.now().isoformat()
+            }
+        
+        # Raw bytes for binary callers, decoded text otherwise
+        output = output_fields(res.stdout, res.stderr, binary_output)
+        
+        if res.success:
+            logger.info("Task %s completed successfully in %.2fs", task_id, res.elapsed)
+            return {
+                "status": "success",
+                "exit_code": res.exit_code,
+                **output,
+                "execution_time": res.elapsed,
+                "completed_at": datetime.now().isoformat()
+            }
+        
+        logger.error("Task %s failed with exit code %s", task_id, res.exit_code)
+        return {
+            "status": "failed",
+            "exit_code": res.exit_code,
+            **output,
+            "execution_time": res.elapsed,
+            "error": f"Command exited with code {res.exit_code}",
+            "completed_at": datetime.now().isoformat()
+        }
+    
+    async def _watch(self, task_id: str, process: asyncio.subprocess.Process):
+        """Drop a process from active_processes once it exits"""
+        await process.wait()
+        if self.active_processes.get(task_id) is process:
+            del self.active_processes[task_id]
     
     def get_active_tasks(self) -> List[str]:
         """Get list of currently executing task IDs"""
-        # Clean up completed processes
-        completed = []
-        for task_id, process in self.active_processes.items():
-            if process.poll() is not None:
-                completed.append(task_id)
-        
-        for task_id in completed:
-            self.active_processes.pop(task_id, None)
-        
-        return list(self.active_processes.keys())
+        return list(self.active_processes)
@@ -1,13 +1,17 @@
 """Main entry point for Nexus_3"""
 import uvicorn
-from .app import app
 from .config import settings
 
 if __name__ == "__main__":
+    # Pass the app as an import string so reload works; uvloop and httptools
+    # come with uvicorn[standard]. Task state lives in process memory, so
+    # this runs a single worker process
     uvicorn.run(
-        app,
+        "nexus.app:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=True,
+        loop="uvloop",
+        http="httptools",
+        reload=settings.debug,
         log_level="info"
     )
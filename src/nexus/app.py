@@ -1,23 +1,25 @@
 """Nexus_3 FastAPI Application"""
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 from datetime import datetime
 import asyncio
-from typing import Dict, List, Optional
-import uuid
+from typing import Dict, List, Optional, Tuple
+import secrets
 import os
+import time
 
 from .config import settings
 from .models import (
-    TaskInfo, TaskStatus, TaskCreateRequest, TaskCreateResponse,
+    TaskInfo, TaskStatus, TaskCreateRequest, TaskCreateResponse, TaskListResponse,
     TaskUpdateRequest, SystemStatus, ServiceStatus, ServiceType,
-    OrchestrationRequest, OrchestrationResponse, TaskType
+    OrchestrationRequest, OrchestrationResponse, OrchestrationStep, TaskType
 )
 from .services.cortex_client import CortexClient
 from .services.task_manager import TaskManager
-from .services.execution_queue import ExecutionQueue, Priority
+from .services.execution_queue import ExecutionQueue, Priority, QueueFullError
 from .modules.base import ModuleLoader
 
 # Configure logging
@@ -32,17 +34,93 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..
 modules_path = os.path.join(project_root, 'modules')
 logger.info(f"Loading modules from: {modules_path}")
 module_loader = ModuleLoader(modules_path)
-execution_queue = ExecutionQueue(module_loader, num_workers=3)
+execution_queue = ExecutionQueue(
+    module_loader, num_workers=3, maxsize=settings.max_queued_tasks
+)
+
+# Static parts of the service statuses, built and validated once; endpoints
+# fill in the dynamic fields with model_copy, which skips validation
+def _service_template(name: str, type: ServiceType, **metadata) -> ServiceStatus:
+    """Build an operational ServiceStatus skeleton"""
+    return ServiceStatus(
+        name=name,
+        type=type,
+        status="operational",
+        healthy=True,
+        last_check=datetime.now(),
+        metadata=metadata
+    )
+
+_CORTEX_HEALTH = _service_template(
+    "cortex", ServiceType.CORTEX, url=settings.cortex_api_url
+)
+_TASK_MANAGER_STATUS = _service_template("task_manager", ServiceType.LOCAL)
+_QUEUE_STATUS = _service_template("execution_queue", ServiceType.LOCAL)
+_CORTEX_SERVICE = _service_template(
+    "cortex", ServiceType.CORTEX,
+    url=settings.cortex_api_url,
+    purpose="Knowledge and memory management"
+)
+
+# Last probe result per service: name -> (monotonic timestamp, healthy).
+# The background poller is the only thing that refreshes it
+_health_cache: Dict[str, Tuple[float, bool]] = {}
+_health_inflight: Optional[asyncio.Future] = None
+
+async def _run_cortex_probe() -> bool:
+    """Probe Cortex and record the result in the health cache"""
+    healthy = await cortex_client.health_check()
+    _health_cache["cortex"] = (time.monotonic(), healthy)
+    return healthy
+
+async def _probe_cortex() -> bool:
+    """Probe Cortex, joining a probe that is already in flight
+    
+    Callers arriving while a probe runs await the same future, so at most
+    one request is ever outstanding against Cortex. The future is shielded
+    so a cancelled caller does not cancel it for the others.
+    """
+    global _health_inflight
+    if _health_inflight is None or _health_inflight.done():
+        _health_inflight = asyncio.ensure_future(_run_cortex_probe())
+    return await asyncio.shield(_health_inflight)
+
+async def _cached_cortex_health() -> bool:
+    """Last known Cortex health; probes only before the first result exists
+    
+    Requests never wait on a refresh, so a slow or hung Cortex cannot stall
+    the health endpoints beyond the very first probe.
+    """
+    cached = _health_cache.get("cortex")
+    if cached:
+        return cached[1]
+    return await _probe_cortex()
+
+async def _poll_cortex_health():
+    """Refresh the Cortex health cache every settings.health_interval seconds"""
+    while True:
+        await _probe_cortex()
+        await asyncio.sleep(settings.health_interval)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifecycle"""
     logger.info("Starting Nexus_3...")
-    app.state.start_time = datetime.now()
+    app.state.start_monotonic = time.monotonic()
+    
+    # Probe Cortex in the background so health endpoints rarely wait on it
+    health_poller = asyncio.create_task(_poll_cortex_health())
     
     # Start execution queue
     await execution_queue.start()
     
+    # Preload configured modules so the first task doesn't pay for loading
+    for module_id in settings.preload_modules:
+        module = await asyncio.to_thread(module_loader.load_module, module_id)
+        if module and not module.is_active:
+            await module.initialize()
+            await module.activate()
+    
     # Don't start the mock task processor - let execution queue handle it
     # asyncio.create_task(task_manager.process_tasks())
     
@@ -50,6 +128,8 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("Shutting down Nexus_3...")
+    health_poller.cancel()
+    await asyncio.gather(health_poller, return_exceptions=True)
     await execution_queue.stop()
     await task_manager.shutdown()
 
@@ -58,7 +138,8 @@ app = FastAPI(
     title="Nexus_3 API",
     description="AI Orchestration System - Modular and Hot-swappable",
     version=settings.version,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -70,6 +151,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    """Shed load when the execution queue is at capacity"""
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": f"Queue full, retry later: {exc}"},
+        headers={"Retry-After": "1"}
+    )
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -93,58 +183,51 @@ async def root():
 @app.get("/health", response_model=SystemStatus)
 async def health_check():
     """System health check"""
-    uptime = (datetime.now() - app.state.start_time).total_seconds()
+    now = datetime.now()
+    uptime = time.monotonic() - app.state.start_monotonic
     
-    # Check Cortex service
-    cortex_healthy = await cortex_client.health_check()
+    # Cortex health from the poller's cache
+    cortex_healthy = await _cached_cortex_health()
     
-    # Get task statistics
-    task_stats = task_manager.get_statistics()
-    
-    # Get queue statistics
+    # Get queue statistics; the queue owns task status, so its counters
+    # double as the task statistics
     queue_stats = execution_queue.get_statistics()
+    task_stats = queue_stats["tasks"]
+    
+    # Only Cortex can be unhealthy; the local services always report healthy
+    overall = "healthy" if cortex_healthy else "degraded"
     
     services = [
-        ServiceStatus(
-            name="cortex",
-            type=ServiceType.CORTEX,
-            status="operational" if cortex_healthy else "degraded",
-            healthy=cortex_healthy,
-            last_check=datetime.now(),
-            metadata={"url": settings.cortex_api_url}
-        ),
-        ServiceStatus(
-            name="task_manager",
-            type=ServiceType.LOCAL,
-            status="operational",
-            healthy=True,
-            last_check=datetime.now(),
-            metadata={"active_tasks": task_stats.get("running", 0)}
-        ),
-        ServiceStatus(
-            name="execution_queue",
-            type=ServiceType.LOCAL,
-            status="operational",
-            healthy=True,
-            last_check=datetime.now(),
-            metadata=queue_stats
-        )
+        _CORTEX_HEALTH.model_copy(update={
+            "status": "operational" if cortex_healthy else "degraded",
+            "healthy": cortex_healthy,
+            "last_check": now
+        }),
+        _TASK_MANAGER_STATUS.model_copy(update={
+            "last_check": now,
+            "metadata": {"active_tasks": task_stats.get("running", 0)}
+        }),
+        _QUEUE_STATUS.model_copy(update={
+            "last_check": now,
+            "metadata": queue_stats
+        })
     ]
     
-    return SystemStatus(
-        status="healthy" if all(s.healthy for s in services) else "degraded",
+    # Every field is computed here, so skip validation
+    return SystemStatus.model_construct(
+        status=overall,
         version=settings.version,
         uptime_seconds=uptime,
         tasks=task_stats,
         services=services,
-        timestamp=datetime.now()
+        timestamp=now
     )
 
 # Task management endpoints
-@app.post("/tasks", response_model=TaskCreateResponse)
-async def create_task(request: TaskCreateRequest, background_tasks: BackgroundTasks):
-    """Create a new task"""
-    task_id = str(uuid.uuid4())
+async def _enqueue_task(request: TaskCreateRequest) -> TaskInfo:
+    """Create a task, queue it for execution and track it"""
+    task_id = secrets.token_hex(16)
+    now = datetime.now()
     
     task = TaskInfo(
         id=task_id,
@@ -153,18 +236,10 @@ async def create_task(request: TaskCreateRequest, background_tasks: BackgroundTa
         description=request.description,
         parameters=request.parameters,
         priority=request.priority,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        created_at=now,
+        updated_at=now
     )
     
-    # Convert task to dict for execution
-    task_dict = task.to_dict()
-    task_dict['command'] = request.parameters.get('command')
-    task_dict['args'] = request.parameters.get('args', [])
-    task_dict['timeout_seconds'] = request.parameters.get('timeout_seconds', 300)
-    task_dict['working_directory'] = request.parameters.get('working_directory')
-    task_dict['environment'] = request.parameters.get('environment', {})
-    
     # Add to execution queue
     priority = Priority.NORMAL
     if request.priority > 7:
@@ -177,18 +252,37 @@ async def create_task(request: TaskCreateRequest, background_tasks: BackgroundTa
     # Also add to task manager for tracking
     await task_manager.add_task(task)
     
+    return task
+
+@app.post("/tasks", response_model=TaskCreateResponse)
+async def create_task(request: TaskCreateRequest):
+    """Create a new task"""
+    task = await _enqueue_task(request)
+    
     return TaskCreateResponse(
-        id=task_id,
+        id=task.id,
         status="created",
-        message=f"Task {task_id} created and queued for execution"
+        message=f"Task {task.id} created and queued for execution"
     )
 
-@app.get("/tasks", response_model=List[TaskInfo])
-async def list_tasks(status: Optional[TaskStatus] = None, limit: int = 100):
-    """List tasks with optional status filter"""
+@app.get("/tasks", response_model=TaskListResponse)
+async def list_tasks(
+    status: Optional[TaskStatus] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None
+):
+    """List tasks with optional status filter
+    
+    At most 1000 tasks are returned per call; follow next_cursor for more.
+    """
     # Get tasks from execution queue (more up-to-date)
-    tasks = execution_queue.list_tasks(status=status, limit=limit)
-    return tasks
+    try:
+        tasks, next_cursor = execution_queue.list_tasks(
+            status=status, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TaskListResponse(tasks=tasks, next_cursor=next_cursor)
 
 @app.get("/tasks/{task_id}", response_model=TaskInfo)
 async def get_task(task_id: str):
@@ -201,9 +295,16 @@ async def get_task(task_id: str):
 @app.put("/tasks/{task_id}", response_model=TaskInfo)
 async def update_task(task_id: str, request: TaskUpdateRequest):
     """Update task status or result"""
+    queued = execution_queue.get_task(task_id)
+    previous = queued.status if queued else None
+    
     task = await task_manager.update_task(task_id, request)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    
+    # The task object is shared with the queue; keep its index in step
+    if previous is not None:
+        execution_queue.record_status_change(task, previous)
     return task
 
 @app.delete("/tasks/{task_id}")
@@ -221,10 +322,12 @@ async def get_queue_stats():
     return execution_queue.get_statistics()
 
 # Module management endpoints
+# Module loading touches the filesystem, parses YAML and imports code, so
+# it runs in a worker thread to keep the event loop free
 @app.get("/modules")
 async def list_modules():
     """List available and loaded modules"""
-    available = module_loader.list_available_modules()
+    available = await asyncio.to_thread(module_loader.list_available_modules)
     loaded = [m.get_status() for m in module_loader.get_loaded_modules().values()]
     
     return {
@@ -232,10 +335,19 @@ async def list_modules():
         "loaded": loaded
     }
 
+@app.post("/modules/refresh")
+async def refresh_modules():
+    """Rescan the modules directory for new or changed manifests"""
+    count = await asyncio.to_thread(module_loader.refresh)
+    return {
+        "status": "refreshed",
+        "modules": count
+    }
+
 @app.post("/modules/{module_id}/load")
 async def load_module(module_id: str):
     """Load a module"""
-    module = module_loader.load_module(module_id)
+    module = await asyncio.to_thread(module_loader.load_module, module_id)
     if not module:
         raise HTTPException(status_code=404, detail="Module not found")
     
@@ -268,12 +380,61 @@ async def get_module_status(module_id: str):
     
     return module.get_status()
 
+# Orchestration steps
+async def _analyze_goal_step(request: OrchestrationRequest) -> OrchestrationStep:
+    """Analyze the goal with Cortex"""
+    step = {
+        "step_number": 1,
+        "action": "analyze_goal",
+        "service": "cortex",
+        "parameters": {"text": request.goal}
+    }
+    
+    try:
+        # This would call Cortex in a real implementation
+        analysis = await cortex_client.analyze_context(request.goal)
+        step["result"] = analysis
+        step["status"] = TaskStatus.COMPLETED
+    except Exception as e:
+        step["status"] = TaskStatus.FAILED
+        step["result"] = {"error": str(e)}
+    
+    return OrchestrationStep(**step)
+
+async def _execute_command_step(request: OrchestrationRequest) -> OrchestrationStep:
+    """Queue the requested command for execution"""
+    task_request = TaskCreateRequest(
+        type=TaskType.GENERATION,
+        description=f"Execute: {request.goal}",
+        parameters={
+            "command": request.context.get("command"),
+            "args": request.context.get("args", [])
+        },
+        priority=5
+    )
+    
+    task = await _enqueue_task(task_request)
+    
+    return OrchestrationStep(
+        step_number=2,
+        action="execute_command",
+        service="execution_queue",
+        parameters={"task_id": task.id},
+        status=TaskStatus.COMPLETED,
+        result={"task_id": task.id}
+    )
+
 # Orchestration endpoint
 @app.post("/orchestrate", response_model=OrchestrationResponse)
 async def orchestrate(request: OrchestrationRequest):
-    """Orchestrate a complex task across services"""
+    """Orchestrate a complex task across services
+    
+    Steps that do not depend on each other's results are started together
+    and awaited with asyncio.gather; steps keep their declared order in the
+    response.
+    """
     # Create orchestration task
-    orch_id = str(uuid.uuid4())
+    orch_id = secrets.token_hex(16)
     
     # Simple orchestration logic for now
     response = OrchestrationResponse(
@@ -283,48 +444,12 @@ async def orchestrate(request: OrchestrationRequest):
         steps=[]
     )
     
-    # Step 1: Analyze goal with Cortex
-    step1 = {
-        "step_number": 1,
-        "action": "analyze_goal",
-        "service": "cortex",
-        "parameters": {"text": request.goal}
-    }
-    
-    try:
-        # This would call Cortex in a real implementation
-        analysis = await cortex_client.analyze_context(request.goal)
-        step1["result"] = analysis
-        step1["status"] = TaskStatus.COMPLETED
-    except Exception as e:
-        step1["status"] = TaskStatus.FAILED
-        step1["result"] = {"error": str(e)}
-    
-    response.steps.append(step1)
-    
-    # Step 2: Create execution task if needed
+    # Goal analysis and command execution are independent
+    steps = [_analyze_goal_step(request)]
     if request.context.get("execute_command"):
-        task_request = TaskCreateRequest(
-            type=TaskType.GENERATION,
-            description=f"Execute: {request.goal}",
-            parameters={
-                "command": request.context.get("command"),
-                "args": request.context.get("args", [])
-            },
-            priority=5
-        )
-        
-        task_response = await create_task(task_request, BackgroundTasks())
-        
-        step2 = {
-            "step_number": 2,
-            "action": "execute_command",
-            "service": "execution_queue",
-            "parameters": {"task_id": task_response.id},
-            "status": TaskStatus.COMPLETED,
-            "result": {"task_id": task_response.id}
-        }
-        response.steps.append(step2)
+        steps.append(_execute_command_step(request))
+    
+    response.steps.extend(await asyncio.gather(*steps))
     
     response.status = TaskStatus.COMPLETED
     response.final_result = {"message": "Orchestration completed", "steps": len(response.steps)}
@@ -335,50 +460,41 @@ async def orchestrate(request: OrchestrationRequest):
 @app.get("/services", response_model=List[ServiceStatus])
 async def list_services():
     """List all integrated services and their status"""
+    now = datetime.now()
     services = []
     
-    # Check Cortex
-    cortex_healthy = await cortex_client.health_check()
+    # Cortex health from the poller's cache
+    cortex_healthy = await _cached_cortex_health()
     services.append(
-        ServiceStatus(
-            name="cortex",
-            type=ServiceType.CORTEX,
-            status="operational" if cortex_healthy else "unreachable",
-            healthy=cortex_healthy,
-            last_check=datetime.now(),
-            metadata={
-                "url": settings.cortex_api_url,
-                "purpose": "Knowledge and memory management"
-            }
-        )
+        _CORTEX_SERVICE.model_copy(update={
+            "status": "operational" if cortex_healthy else "unreachable",
+            "healthy": cortex_healthy,
+            "last_check": now
+        })
     )
     
     # Add execution queue status
     queue_stats = execution_queue.get_statistics()
     services.append(
-        ServiceStatus(
-            name="execution_queue",
-            type=ServiceType.LOCAL,
-            status="operational",
-            healthy=True,
-            last_check=datetime.now(),
-            metadata={
+        _QUEUE_STATUS.model_copy(update={
+            "last_check": now,
+            "metadata": {
                 "workers": queue_stats["workers"],
                 "queues": queue_stats["queues"],
                 "purpose": "Task execution with modular executors"
             }
-        )
+        })
     )
     
     # Add loaded modules
     for module_id, module in module_loader.get_loaded_modules().items():
         services.append(
-            ServiceStatus(
+            ServiceStatus.model_construct(
                 name=f"module:{module_id}",
                 type=ServiceType.MODULE,
                 status="operational" if module.is_active else "inactive",
                 healthy=module.is_active,
-                last_check=datetime.now(),
+                last_check=now,
                 metadata=module.get_status()
             )
         )
@@ -388,4 +504,10 @@ async def list_services():
 # Run the app
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=settings.api_host, port=settings.api_port)
+    uvicorn.run(
+        app,
+        host=settings.api_host,
+        port=settings.api_port,
+        loop="uvloop",
+        http="httptools"
+    )
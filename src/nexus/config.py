@@ -1,6 +1,6 @@
 """Nexus configuration"""
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List
 
 class Settings(BaseSettings):
     # Application
@@ -15,11 +15,16 @@ class Settings(BaseSettings):
     # Cortex integration
     cortex_api_url: str = "http://localhost:8000"
     cortex_timeout: int = 30
+    health_interval: float = 5.0  # seconds between Cortex health probes
     
     # Service settings
     max_concurrent_tasks: int = 10
+    max_queued_tasks: int = 100  # pending tasks per priority before returning 503
     task_timeout: int = 300  # 5 minutes
     
+    # Module settings
+    preload_modules: List[str] = []  # module ids loaded and activated at startup
+    
     class Config:
         env_prefix = "NEXUS_"
 
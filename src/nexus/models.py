@@ -1,8 +1,9 @@
 """API Response Models"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 from enum import Enum
+import base64
 
 class TaskStatus(str, Enum):
     PENDING = "pending"
@@ -51,8 +52,26 @@ class TaskInfo(BaseModel):
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     
+    @field_serializer('result', when_used='json')
+    def _serialize_result(
+        self, result: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Base64-encode raw output bytes (binary_output tasks) for JSON"""
+        if not result:
+            return result
+        return {
+            k: base64.b64encode(v).decode('ascii') if isinstance(v, bytes) else v
+            for k, v in result.items()
+        }
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for module execution"""
+        created_at = self.created_at.isoformat()
+        # New tasks are stamped with one timestamp for both fields
+        if self.updated_at == self.created_at:
+            updated_at = created_at
+        else:
+            updated_at = self.updated_at.isoformat()
         return {
             "id": self.id,
             "type": self.type.value,
@@ -60,14 +79,18 @@ class TaskInfo(BaseModel):
             "description": self.description,
             "parameters": self.parameters,
             "priority": self.priority,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "started_at": self.started_at and self.started_at.isoformat(),
+            "completed_at": self.completed_at and self.completed_at.isoformat(),
             "result": self.result,
             "error": self.error
         }
 
+class TaskListResponse(BaseModel):
+    tasks: List[TaskInfo]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
 class TaskCreateResponse(BaseModel):
     id: str
     status: str
@@ -1,27 +1,51 @@
 """Base Module System for Nexus_3"""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple, Mapping, Callable
+from types import MappingProxyType
 from datetime import datetime
 import yaml
 import importlib.util
 import os
 import logging
+import threading
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
 
 logger = logging.getLogger(__name__)
 
+@dataclass(slots=True)
 class ModuleManifest:
     """Module manifest data"""
-    def __init__(self, manifest_data: Dict[str, Any]):
-        self.id = manifest_data['id']
-        self.version = manifest_data['version']
-        self.type = manifest_data['type']
-        self.name = manifest_data['name']
-        self.description = manifest_data.get('description', '')
-        self.metadata = manifest_data.get('metadata', {})
-        self.capabilities = manifest_data.get('capabilities', [])
-        self.dependencies = manifest_data.get('dependencies', [])
-        self.config = manifest_data.get('config', {})
-        self.entry_point = manifest_data.get('entry_point', 'module.py')
+    id: str
+    version: str
+    type: str
+    name: str
+    description: str = ''
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    capabilities: List[str] = field(default_factory=list)
+    dependencies: List[str] = field(default_factory=list)
+    config: Dict[str, Any] = field(default_factory=dict)
+    entry_point: str = 'module.py'
+    
+    @classmethod
+    def from_dict(cls, manifest_data: Dict[str, Any]) -> 'ModuleManifest':
+        """Build a manifest from parsed YAML (KeyError if a required key is missing)"""
+        return cls(
+            id=manifest_data['id'],
+            version=manifest_data['version'],
+            type=manifest_data['type'],
+            name=manifest_data['name'],
+            description=manifest_data.get('description', ''),
+            metadata=manifest_data.get('metadata', {}),
+            capabilities=manifest_data.get('capabilities', []),
+            dependencies=manifest_data.get('dependencies', []),
+            config=manifest_data.get('config', {}),
+            entry_point=manifest_data.get('entry_point', 'module.py')
+        )
 
 class BaseModule(ABC):
     """Base class for all Nexus modules"""
@@ -32,10 +56,17 @@ class BaseModule(ABC):
         self.version = manifest.version
         self.type = manifest.type
         self.name = manifest.name
-        self.config = manifest.config.copy()
+        # Share the manifest's config read-only; update_config makes the copy
+        self._config: Mapping[str, Any] = MappingProxyType(manifest.config)
+        self._config_overrides: Optional[Dict[str, Any]] = None
         self.loaded_at = datetime.now()
         self.is_active = False
         
+    @property
+    def config(self) -> Mapping[str, Any]:
+        """Module configuration (read-only; change it with update_config)"""
+        return self._config
+    
     @abstractmethod
     async def initialize(self) -> bool:
         """Initialize the module"""
@@ -79,7 +110,10 @@ class BaseModule(ABC):
     
     def update_config(self, config: Dict[str, Any]) -> bool:
         """Update module configuration"""
-        self.config.update(config)
+        if self._config_overrides is None:
+            self._config_overrides = dict(self.manifest.config)
+            self._config = MappingProxyType(self._config_overrides)
+        self._config_overrides.update(config)
         logger.info(f"Module {self.id} config updated")
         return True
 
@@ -102,42 +136,108 @@ class ModuleLoader:
     def __init__(self, modules_path: str):
         self.modules_path = modules_path
         self.loaded_modules: Dict[str, BaseModule] = {}
+        # module id -> (module directory, manifest)
+        self._manifest_index: Dict[str, Tuple[str, ModuleManifest]] = {}
+        # manifest path -> (st_mtime_ns, manifest)
+        self._manifest_cache: Dict[str, Tuple[int, ModuleManifest]] = {}
+        self._load_lock = threading.Lock()
+        # Called with the module id whenever a module is loaded or unloaded
+        self._listeners: List[Callable[[str], None]] = []
+        self._scan_manifests()
+        
+    def _scan_manifests(self):
+        """Index every manifest under modules_path by module id"""
+        index = {}
+        for module_path in self._iter_module_dirs(self.modules_path):
+            manifest = self.load_manifest(module_path)
+            if manifest:
+                index[manifest.id] = (module_path, manifest)
+        self._manifest_index = index
+    
+    def _iter_module_dirs(self, path: str):
+        """Yield directories under path that contain a manifest.yaml
         
+        Modules live under category directories (executors/<module>/), so
+        this descends with os.scandir, whose entries answer is_dir() without
+        an extra stat, and stops at the first directory holding a manifest.
+        """
+        try:
+            with os.scandir(path) as it:
+                subdirs = []
+                for entry in it:
+                    if entry.name == 'manifest.yaml' and entry.is_file():
+                        yield path
+                        return
+                    if entry.name.startswith(('.', '__')):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+        except OSError as e:
+            logger.error(f"Cannot scan {path}: {e}")
+            return
+        
+        for subdir in subdirs:
+            yield from self._iter_module_dirs(subdir)
+    
+    def refresh(self) -> int:
+        """Rescan modules_path for added, removed or changed manifests"""
+        self._scan_manifests()
+        logger.info(f"Module index refreshed: {len(self._manifest_index)} modules")
+        return len(self._manifest_index)
+    
     def load_manifest(self, module_path: str) -> Optional[ModuleManifest]:
         """Load module manifest from YAML"""
         manifest_path = os.path.join(module_path, 'manifest.yaml')
-        if not os.path.exists(manifest_path):
+        try:
+            mtime = os.stat(manifest_path).st_mtime_ns
+        except FileNotFoundError:
             logger.error(f"Manifest not found: {manifest_path}")
             return None
+        
+        # Reuse the parsed manifest until the file changes
+        cached = self._manifest_cache.get(manifest_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
             
         try:
-            with open(manifest_path, 'r') as f:
-                manifest_data = yaml.safe_load(f)
-            return ModuleManifest(manifest_data)
+            with open(manifest_path, 'rb') as f:
+                manifest_data = yaml.load(f, Loader=SafeLoader)
+            manifest = ModuleManifest.from_dict(manifest_data)
+            self._manifest_cache[manifest_path] = (mtime, manifest)
+            return manifest
         except Exception as e:
             logger.error(f"Failed to load manifest: {e}")
             return None
     
+    def add_listener(self, callback: Callable[[str], None]):
+        """Register a callback for module load/unload events"""
+        self._listeners.append(callback)
+    
+    def _notify(self, module_id: str):
+        """Tell listeners the set of loaded modules changed"""
+        for callback in self._listeners:
+            callback(module_id)
+    
     def load_module(self, module_id: str) -> Optional[BaseModule]:
         """Load a module by ID"""
+        # Endpoints call this from worker threads; don't load a module twice
+        with self._load_lock:
+            return self._load_module(module_id)
+    
+    def _load_module(self, module_id: str) -> Optional[BaseModule]:
+        """Load a module by ID (caller holds _load_lock)"""
         if module_id in self.loaded_modules:
             logger.info(f"Module {module_id} already loaded")
             return self.loaded_modules[module_id]
         
         # Find module directory
-        module_path = None
-        for root, dirs, files in os.walk(self.modules_path):
-            if 'manifest.yaml' in files:
-                manifest = self.load_manifest(root)
-                if manifest and manifest.id == module_id:
-                    module_path = root
-                    break
-        
-        if not module_path:
+        entry = self._manifest_index.get(module_id)
+        if not entry:
             logger.error(f"Module {module_id} not found")
             return None
         
-        # Load manifest
+        # Re-read through the mtime cache so manifest edits are picked up
+        module_path = entry[0]
         manifest = self.load_manifest(module_path)
         if not manifest:
             return None
@@ -157,6 +257,7 @@ class ModuleLoader:
             # Instantiate module
             module_instance = module.Module(manifest)
             self.loaded_modules[module_id] = module_instance
+            self._notify(module_id)
             
             logger.info(f"Module {module_id} loaded successfully")
             return module_instance
@@ -179,28 +280,24 @@ class ModuleLoader:
         
         # Remove from loaded modules
         del self.loaded_modules[module_id]
+        self._notify(module_id)
         
         logger.info(f"Module {module_id} unloaded")
         return True
     
     def list_available_modules(self) -> List[Dict[str, Any]]:
         """List all available modules"""
-        modules = []
-        
-        for root, dirs, files in os.walk(self.modules_path):
-            if 'manifest.yaml' in files:
-                manifest = self.load_manifest(root)
-                if manifest:
-                    modules.append({
-                        "id": manifest.id,
-                        "name": manifest.name,
-                        "type": manifest.type,
-                        "version": manifest.version,
-                        "description": manifest.description,
-                        "loaded": manifest.id in self.loaded_modules
-                    })
-        
-        return modules
+        return [
+            {
+                "id": manifest.id,
+                "name": manifest.name,
+                "type": manifest.type,
+                "version": manifest.version,
+                "description": manifest.description,
+                "loaded": manifest.id in self.loaded_modules
+            }
+            for module_path, manifest in self._manifest_index.values()
+        ]
     
     def get_loaded_modules(self) -> Dict[str, BaseModule]:
         """Get all loaded modules"""
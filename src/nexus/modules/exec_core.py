@@ -0,0 +1,122 @@
+"""Shared subprocess execution path for executor modules"""
+import asyncio
+import os
+import signal
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Union, Callable
+
+
+@dataclass(slots=True)
+class ExecResult:
+    """Outcome of a finished (or timed out) command"""
+    success: bool
+    exit_code: Optional[int]
+    stdout: bytes
+    stderr: bytes
+    elapsed: float
+    timed_out: bool = False
+
+
+def output_fields(
+    stdout: Optional[bytes], stderr: Optional[bytes], binary: bool
+) -> Dict[str, Any]:
+    """Build the output fields of a result dict, decoding only for text callers"""
+    if binary:
+        return {"stdout_bytes": stdout or b"", "stderr_bytes": stderr or b""}
+    return {
+        "stdout": stdout.decode('utf-8', errors='replace') if stdout else "",
+        "stderr": stderr.decode('utf-8', errors='replace') if stderr else ""
+    }
+
+
+def signal_process_group(process: asyncio.subprocess.Process, sig: int):
+    """Signal a child's whole process group (run_cmd starts it in its own session)"""
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _read_capture(f) -> bytes:
+    """Read everything the child wrote to a capture file"""
+    if f is asyncio.subprocess.DEVNULL:
+        return b""
+    f.seek(0)
+    return f.read()
+
+
+async def run_cmd(
+    cmd: Union[str, List[str]],
+    *,
+    env: Dict[str, str],
+    cwd: Optional[str],
+    timeout: float,
+    capture: bool = True,
+    shell: bool = False,
+    on_spawn: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    kill_grace: float = 5
+) -> ExecResult:
+    """Run a command to completion
+
+    `cmd` is a string when `shell` is set and an argv list otherwise. Output
+    is written by the child straight into temp files, so there is no pipe to
+    drain. The child leads its own process group; on timeout the group gets
+    SIGTERM and, after `kill_grace` seconds, SIGKILL. `on_spawn` is called
+    with the process right after it starts.
+    """
+    if capture:
+        out_f, err_f = tempfile.TemporaryFile(), tempfile.TemporaryFile()
+    else:
+        out_f = err_f = asyncio.subprocess.DEVNULL
+
+    try:
+        start_time = time.monotonic()
+
+        if shell:
+            proc = await asyncio.create_subprocess_shell(
+                cmd,
+                stdout=out_f,
+                stderr=err_f,
+                cwd=cwd,
+                env=env,
+                start_new_session=True
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=out_f,
+                stderr=err_f,
+                cwd=cwd,
+                env=env,
+                start_new_session=True
+            )
+
+        if on_spawn:
+            on_spawn(proc)
+
+        timed_out = False
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            signal_process_group(proc, signal.SIGTERM)
+            try:
+                await asyncio.wait_for(proc.wait(), timeout=kill_grace)
+            except asyncio.TimeoutError:
+                signal_process_group(proc, signal.SIGKILL)
+                await proc.wait()
+
+        return ExecResult(
+            success=not timed_out and proc.returncode == 0,
+            exit_code=proc.returncode,
+            stdout=_read_capture(out_f),
+            stderr=_read_capture(err_f),
+            elapsed=time.monotonic() - start_time,
+            timed_out=timed_out
+        )
+    finally:
+        if capture:
+            out_f.close()
+            err_f.close()
@@ -1,14 +1,31 @@
 """Module loader for Nexus_3"""
 import os
+import asyncio
+import itertools
 import yaml
 import importlib.util
+from importlib.machinery import SourceFileLoader
 import logging
 from pathlib import Path
-from typing import Dict, Optional, List, Type
+from collections import defaultdict
+from typing import Dict, Optional, List, Type, Tuple, Any, Set, Iterator
 from .base import BaseModule, ModuleManifest
 
 logger = logging.getLogger(__name__)
 
+# libyaml's C parser when PyYAML was built with it
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Manifest fields: required keys, then optional keys with a factory for
+# their default (a fresh container per manifest, never a shared one)
+_REQUIRED = ('id', 'version', 'type', 'name', 'description', 'entry_point')
+_OPTIONAL = (
+    ('metadata', dict),
+    ('capabilities', list),
+    ('dependencies', list),
+    ('config', dict),
+)
+
 
 class ModuleLoader:
     """Loads and manages Nexus modules"""
@@ -20,51 +37,93 @@ class ModuleLoader:
         ))
         self.loaded_modules: Dict[str, BaseModule] = {}
         self.available_modules: Dict[str, ModuleManifest] = {}
+        # manifest path -> (st_mtime_ns, st_size, manifest)
+        self._manifest_cache: Dict[str, Tuple[int, int, ModuleManifest]] = {}
+        # module id -> (entry point st_mtime_ns, module class)
+        self._class_cache: Dict[str, Tuple[int, Type[BaseModule]]] = {}
+        # entry point path -> source loader, reused across reloads
+        self._loader_cache: Dict[str, SourceFileLoader] = {}
+        # capability -> ids of loaded modules that declare it
+        self._cap_index: Dict[str, Set[str]] = defaultdict(set)
+        # module id -> load sequence number, so capability lookups can
+        # return load order without walking loaded_modules
+        self._load_seq: Dict[str, int] = {}
+        self._seq = itertools.count()
+        # module id -> load in progress, shared by concurrent callers
+        self._loading: Dict[str, asyncio.Future] = {}
+        # module id -> load layers, see _plan_load
+        self._plan_cache: Dict[str, List[List[str]]] = {}
+        
+    async def scan_modules(self) -> Dict[str, ModuleManifest]:
+        """Scan modules directory for available modules
         
-    def scan_modules(self) -> Dict[str, ModuleManifest]:
-        """Scan modules directory for available modules"""
-        self.available_modules.clear()
+        Directory walking and YAML parsing run in a worker thread so the
+        event loop keeps serving requests during a scan.
+        """
+        self.available_modules = await asyncio.to_thread(self._scan_modules_sync)
+        self._plan_cache.clear()
+        return self.available_modules
+    
+    def _scan_modules_sync(self) -> Dict[str, ModuleManifest]:
+        """Blocking scan; returns a fresh id -> manifest map"""
+        available: Dict[str, ModuleManifest] = {}
         
         for module_type in ["orchestrators", "analyzers", "executors", "integrations"]:
-            type_dir = self.modules_dir / module_type
-            if not type_dir.exists():
+            type_dir = os.path.join(self.modules_dir, module_type)
+            try:
+                it = os.scandir(type_dir)
+            except FileNotFoundError:
                 continue
-                
-            for module_dir in type_dir.iterdir():
-                if not module_dir.is_dir():
-                    continue
+            
+            # DirEntry.is_dir answers from the readdir data, and the manifest
+            # stat doubles as the existence check and the cache validator
+            with it:
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                    
+                    manifest_path = os.path.join(entry.path, "manifest.yaml")
+                    try:
+                        st = os.stat(manifest_path)
+                    except FileNotFoundError:
+                        continue
                     
-                manifest_path = module_dir / "manifest.yaml"
-                if manifest_path.exists():
                     try:
-                        manifest = self._load_manifest(manifest_path)
-                        self.available_modules[manifest.id] = manifest
+                        manifest = self._load_manifest(manifest_path, st)
+                        available[manifest.id] = manifest
                         logger.info(f"Found module: {manifest.id} ({manifest.name})")
                     except Exception as e:
                         logger.error(f"Failed to load manifest from {manifest_path}: {e}")
         
-        return self.available_modules
+        return available
     
-    def _load_manifest(self, manifest_path: Path) -> ModuleManifest:
-        """Load module manifest from YAML file"""
-        with open(manifest_path, 'r') as f:
-            data = yaml.safe_load(f)
-        
-        return ModuleManifest(
-            id=data['id'],
-            version=data['version'],
-            type=data['type'],
-            name=data['name'],
-            description=data['description'],
-            metadata=data.get('metadata', {}),
-            capabilities=data.get('capabilities', []),
-            dependencies=data.get('dependencies', []),
-            config=data.get('config', {}),
-            entry_point=data['entry_point']
+    def _load_manifest(
+        self, manifest_path: str, st: Optional[os.stat_result] = None
+    ) -> ModuleManifest:
+        """Load module manifest from YAML file
+        
+        Parsed manifests are cached until the file's mtime or size changes.
+        Pass st when the caller has already stat'ed the file.
+        """
+        if st is None:
+            st = os.stat(manifest_path)
+        cached = self._manifest_cache.get(manifest_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        # Binary mode hands libyaml the raw bytes without a text decode
+        with open(manifest_path, 'rb') as f:
+            data = yaml.load(f, Loader=_SafeLoader)
+        
+        manifest = ModuleManifest(
+            **{k: data[k] for k in _REQUIRED},
+            **{k: data[k] if k in data else default() for k, default in _OPTIONAL}
         )
+        self._manifest_cache[manifest_path] = (st.st_mtime_ns, st.st_size, manifest)
+        return manifest
     
     async def load_module(self, module_id: str) -> Optional[BaseModule]:
-        """Load a module by ID"""
+        """Load a module by ID, loading its dependencies first"""
         # Check if already loaded
         if module_id in self.loaded_modules:
             logger.info(f"Module {module_id} already loaded")
@@ -75,38 +134,111 @@ class ModuleLoader:
             logger.error(f"Module {module_id} not found")
             return None
         
-        manifest = self.available_modules[module_id]
+        try:
+            plan = self._plan_load(module_id)
+        except ValueError as e:
+            logger.error(f"Cannot load {module_id}: {e}")
+            return None
         
-        # Check dependencies
-        for dep in manifest.dependencies:
-            if dep not in self.loaded_modules:
-                logger.info(f"Loading dependency {dep} for {module_id}")
-                dep_module = await self.load_module(dep)
-                if not dep_module:
-                    logger.error(f"Failed to load dependency {dep}")
+        # Modules within a layer don't depend on each other, so they load
+        # concurrently; each layer waits for the one before it
+        for layer in plan:
+            pending = [mid for mid in layer if mid not in self.loaded_modules]
+            results = await asyncio.gather(*(self._load_single(mid) for mid in pending))
+            for mid, loaded in zip(pending, results):
+                if not loaded:
+                    if mid != module_id:
+                        logger.error(f"Failed to load dependency {mid}")
                     return None
         
+        return self.loaded_modules.get(module_id)
+    
+    def _plan_load(self, module_id: str) -> List[List[str]]:
+        """Order a module and its dependencies into load layers
+        
+        Layer 0 has no unloaded dependencies; each later layer depends only
+        on earlier ones. Raises ValueError on a dependency cycle. Plans are
+        memoized until the next scan_modules().
+        """
+        if module_id in self._plan_cache:
+            return self._plan_cache[module_id]
+        
+        depth: Dict[str, int] = {}
+        # Current DFS path, for the cycle message, and a set mirror of it
+        visiting: List[str] = []
+        on_path: Set[str] = set()
+        # Explicit DFS stack of (module id, iterator over its dependencies),
+        # so a long dependency chain can't hit the recursion limit
+        stack: List[Tuple[str, Iterator[str]]] = []
+        
+        def enter(mid: str):
+            if mid in on_path:
+                cycle = visiting[visiting.index(mid):] + [mid]
+                raise ValueError(f"dependency cycle {' -> '.join(cycle)}")
+            manifest = self.available_modules.get(mid)
+            if mid in self.loaded_modules or not manifest:
+                # Loaded modules need nothing; unknown ones fail in _load_single
+                depth[mid] = 0
+                return
+            visiting.append(mid)
+            on_path.add(mid)
+            stack.append((mid, iter(manifest.dependencies)))
+        
+        enter(module_id)
+        while stack:
+            mid, deps = stack[-1]
+            for dep in deps:
+                if dep not in depth:
+                    enter(dep)
+                    if stack[-1][0] != mid:
+                        break  # descend into dep before finishing mid
+            else:
+                # Every dependency has a depth; mid sits one layer above them
+                stack.pop()
+                visiting.pop()
+                on_path.discard(mid)
+                deps_of = self.available_modules[mid].dependencies
+                depth[mid] = 1 + max((depth[dep] for dep in deps_of), default=-1)
+        
+        layers: List[List[str]] = [[] for _ in range(max(depth.values()) + 1)]
+        for mid, d in depth.items():
+            layers[d].append(mid)
+        
+        self._plan_cache[module_id] = layers
+        return layers
+    
+    async def _load_single(self, module_id: str) -> Optional[BaseModule]:
+        """Load one module (dependencies must be loaded)
+        
+        Overlapping load_module calls that need the same module await one
+        shared load instead of importing and initializing it twice. The
+        load is shielded so a cancelled caller doesn't cancel it for others.
+        """
+        if module_id in self.loaded_modules:
+            return self.loaded_modules[module_id]
+        
+        inflight = self._loading.get(module_id)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._load_single_now(module_id))
+            self._loading[module_id] = inflight
+            inflight.add_done_callback(lambda _: self._loading.pop(module_id, None))
+        return await asyncio.shield(inflight)
+    
+    async def _load_single_now(self, module_id: str) -> Optional[BaseModule]:
+        """Import, instantiate and initialize one module"""
+        manifest = self.available_modules.get(module_id)
+        if not manifest:
+            logger.error(f"Module {module_id} not found")
+            return None
+        
         # Load the module
         try:
             module_dir = self.modules_dir / manifest.type / module_id
             module_path = module_dir / manifest.entry_point
-            
-            # Dynamic import
-            spec = importlib.util.spec_from_file_location(module_id, module_path)
-            module_lib = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module_lib)
-            
-            # Find the module class (assumes it's named Module)
-            module_class = getattr(module_lib, 'Module', None)
-            if not module_class:
-                # Try to find any class that inherits from BaseModule
-                for name, obj in module_lib.__dict__.items():
-                    if isinstance(obj, type) and issubclass(obj, BaseModule) and obj != BaseModule:
-                        module_class = obj
-                        break
-            
-            if not module_class:
-                raise RuntimeError(f"No module class found in {module_path}")
+            # Importing executes the entry point; keep it off the event loop
+            module_class = await asyncio.to_thread(
+                self._resolve_class, module_id, module_path
+            )
             
             # Create instance
             module_instance = module_class(manifest)
@@ -114,6 +246,9 @@ class ModuleLoader:
             # Initialize
             if await module_instance.initialize():
                 self.loaded_modules[module_id] = module_instance
+                self._load_seq[module_id] = next(self._seq)
+                for cap in manifest.capabilities:
+                    self._cap_index[cap].add(module_id)
                 logger.info(f"Successfully loaded module {module_id}")
                 return module_instance
             else:
@@ -124,6 +259,41 @@ class ModuleLoader:
             logger.error(f"Failed to load module {module_id}: {e}")
             return None
     
+    def _resolve_class(self, module_id: str, module_path: Path) -> Type[BaseModule]:
+        """Import an entry point and find its module class
+        
+        The class is cached until the entry point's mtime changes, so
+        reloading an unchanged module only builds a new instance.
+        """
+        mtime = module_path.stat().st_mtime_ns
+        cached = self._class_cache.get(module_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        # Dynamic import; entry points are always .py source, so use a
+        # SourceFileLoader directly instead of resolving one per load
+        path = str(module_path)
+        loader = self._loader_cache.get(path)
+        if loader is None:
+            loader = self._loader_cache[path] = SourceFileLoader(module_id, path)
+        spec = importlib.util.spec_from_loader(module_id, loader)
+        module_lib = importlib.util.module_from_spec(spec)
+        loader.exec_module(module_lib)
+        
+        # Find the module class (assumes it's named Module), else any class
+        # that inherits from BaseModule
+        module_class = getattr(module_lib, 'Module', None) or next(
+            (obj for obj in vars(module_lib).values()
+             if isinstance(obj, type) and issubclass(obj, BaseModule)
+             and obj is not BaseModule),
+            None
+        )
+        if not module_class:
+            raise RuntimeError(f"No module class found in {module_path}")
+        
+        self._class_cache[module_id] = (mtime, module_class)
+        return module_class
+    
     async def unload_module(self, module_id: str, force: bool = False) -> bool:
         """Unload a module"""
         if module_id not in self.loaded_modules:
@@ -143,6 +313,15 @@ class ModuleLoader:
         try:
             await module.cleanup()
             del self.loaded_modules[module_id]
+            self._load_seq.pop(module_id, None)
+            for cap in module.manifest.capabilities:
+                ids = self._cap_index.get(cap)
+                if ids:
+                    ids.discard(module_id)
+                    if not ids:
+                        del self._cap_index[cap]
+            # Plans treat loaded modules as satisfied; that no longer holds
+            self._plan_cache.clear()
             logger.info(f"Successfully unloaded module {module_id}")
             return True
         except Exception as e:
@@ -161,12 +340,21 @@ class ModuleLoader:
         return self.loaded_modules.get(module_id)
     
     def find_modules_with_capabilities(self, capabilities: List[str]) -> List[BaseModule]:
-        """Find loaded modules that have all specified capabilities"""
-        matching_modules = []
-        for module in self.loaded_modules.values():
-            if module.matches_capabilities(capabilities):
-                matching_modules.append(module)
-        return matching_modules
+        """Find loaded modules that have all specified capabilities
+        
+        The matching ids come from intersecting the capability index
+        instead of testing each module, and are returned in load order.
+        """
+        if not capabilities:
+            return list(self.loaded_modules.values())
+        
+        # Intersect starting from the rarest capability
+        postings = sorted(
+            (self._cap_index.get(cap, set()) for cap in capabilities), key=len
+        )
+        ids = set(postings[0]).intersection(*postings[1:])
+        ordered = sorted(ids, key=self._load_seq.__getitem__)
+        return [self.loaded_modules[mid] for mid in ordered]
     
     async def reload_module(self, module_id: str) -> Optional[BaseModule]:
         """Reload a module (unload and load again)"""
@@ -175,7 +363,7 @@ class ModuleLoader:
             await self.unload_module(module_id, force=True)
         
         # Rescan to pick up any manifest changes
-        self.scan_modules()
+        await self.scan_modules()
         
         # Load again
         return await self.load_module(module_id)
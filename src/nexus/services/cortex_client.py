@@ -1,5 +1,6 @@
 """Cortex API Client"""
 import httpx
+import orjson
 import logging
 from typing import Dict, Any, Optional
 
@@ -11,12 +12,31 @@ class CortexClient:
     def __init__(self, base_url: str, timeout: int = 30):
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
+        # One pooled client for every call; HTTP/2 multiplexes requests over
+        # a single connection when Cortex is served over TLS
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=10,
+                max_connections=20,
+                keepalive_expiry=30.0
+            )
+        )
+    
+    async def _post_json(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """POST a JSON body encoded with orjson"""
+        return await self.client.post(
+            path,
+            content=orjson.dumps(payload),
+            headers={"content-type": "application/json"}
+        )
     
     async def health_check(self) -> bool:
         """Check if Cortex is healthy"""
         try:
-            response = await self.client.get(f"{self.base_url}/health")
+            response = await self.client.get("/health")
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Cortex health check failed: {e}")
@@ -25,10 +45,7 @@ class CortexClient:
     async def analyze_context(self, text: str) -> Dict[str, Any]:
         """Analyze text context using Cortex"""
         try:
-            response = await self.client.post(
-                f"{self.base_url}/context/analyze",
-                json={"text": text}
-            )
+            response = await self._post_json("/context/analyze", {"text": text})
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -38,9 +55,9 @@ class CortexClient:
     async def query_knowledge_graph(self, query_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Query the knowledge graph"""
         try:
-            response = await self.client.post(
-                f"{self.base_url}/knowledge-graph/query",
-                json={"query_type": query_type, "parameters": parameters}
+            response = await self._post_json(
+                "/knowledge-graph/query",
+                {"query_type": query_type, "parameters": parameters}
             )
             response.raise_for_status()
             return response.json()
@@ -51,7 +68,7 @@ class CortexClient:
     async def get_memory_usage(self) -> Dict[str, Any]:
         """Get memory usage from Cortex"""
         try:
-            response = await self.client.get(f"{self.base_url}/resources/memory")
+            response = await self.client.get("/resources/memory")
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -2,41 +2,83 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Set
 from enum import Enum
 import uuid
-import threading
-from collections import defaultdict
+from collections import Counter
+import itertools
+import heapq
+import base64
 
 from ..models import TaskInfo, TaskStatus, TaskType
 from ..modules.base import ModuleLoader, ExecutorModule
 
 logger = logging.getLogger(__name__)
 
+def _make_cursor(task: TaskInfo) -> str:
+    """Encode a task's (created_at, id) key as an opaque list_tasks cursor"""
+    key = f"{task.created_at.isoformat()}_{task.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+def _parse_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a list_tasks cursor into its (created_at, id) key
+    
+    Raises ValueError for anything _make_cursor could not have produced.
+    """
+    try:
+        key = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, sep, task_id = key.rpartition('_')
+        parsed = datetime.fromisoformat(created_at)
+    except ValueError:
+        # binascii.Error and UnicodeDecodeError are ValueErrors too
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+    # created_at is naive; an aware timestamp could not be compared with it
+    if not sep or parsed.tzinfo is not None:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return parsed, task_id
+
+class QueueFullError(Exception):
+    """Raised when a priority queue is at capacity"""
+    pass
+
 class Priority(Enum):
     URGENT = "urgent"
     NORMAL = "normal"
     BATCH = "batch"
 
+# Queue order of each priority
+_RANK = {Priority.URGENT: 0, Priority.NORMAL: 1, Priority.BATCH: 2}
+
 class ExecutionQueue:
     """Advanced execution queue with modular executor support"""
     
-    def __init__(self, module_loader: ModuleLoader, num_workers: int = 3):
+    def __init__(
+        self,
+        module_loader: ModuleLoader,
+        num_workers: int = 3,
+        maxsize: int = 100
+    ):
         self.module_loader = module_loader
         self.num_workers = num_workers
+        # Pending tasks allowed per priority queue before submissions are
+        # rejected; 0 means unbounded
+        self.maxsize = maxsize
         
         # Task storage
         self.tasks: Dict[str, TaskInfo] = {}
         
-        # Priority queues
-        self.task_queues: Dict[str, List[str]] = {
-            Priority.URGENT.value: [],
-            Priority.NORMAL.value: [],
-            Priority.BATCH.value: []
-        }
+        # One priority queue of (rank, seq, task_id): lower rank first, FIFO
+        # within a rank. Workers await it, so they wake as soon as a task is
+        # submitted. Everything runs on the event loop, so no lock is needed
+        self._pq: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
         
-        # Queue lock for thread safety
-        self.queue_lock = threading.Lock()
+        # Cancelling leaves a tombstone in the queue instead of removing the
+        # id; get_next_task drops tombstones as it reaches them. _queued maps
+        # each live queued id to its priority, _pending counts them
+        self._queued: Dict[str, str] = {}
+        self._cancelled: Set[str] = set()
+        self._pending: Counter = Counter()
         
         # Workers
         self.workers: List['QueueWorker'] = []
@@ -48,8 +90,37 @@ class ExecutionQueue:
             "total_submitted": 0,
             "total_completed": 0,
             "total_failed": 0,
-            "by_executor": defaultdict(lambda: {"completed": 0, "failed": 0})
+            "total_rejected": 0
+        }
+        # Per-executor outcomes; get_statistics merges them into by_executor
+        self.completed_by_executor: Counter = Counter()
+        self.failed_by_executor: Counter = Counter()
+        
+        # Tasks bucketed by status (id -> task), kept in step with every
+        # transition so statistics and filtered listings never walk self.tasks
+        self._by_status: Dict[TaskStatus, Dict[str, TaskInfo]] = {
+            status: {} for status in TaskStatus
         }
+        
+        # (task type, parameter names) -> id of the executor that took it
+        self._executor_cache: Dict[Tuple[TaskType, Tuple[str, ...]], str] = {}
+        self._default_executor: Optional[ExecutorModule] = None
+        # Loop the queue runs on, set by start(); loader events can arrive
+        # from worker threads and are handed over to it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        module_loader.add_listener(self._on_modules_changed)
+    
+    def _set_status(self, task: TaskInfo, status: TaskStatus):
+        """Move a task to a new status, updating the status index"""
+        old = task.status
+        task.status = status
+        self.record_status_change(task, old)
+    
+    def record_status_change(self, task: TaskInfo, old: TaskStatus):
+        """Re-index a task whose status changed from old to task.status"""
+        if old != task.status:
+            self._by_status[old].pop(task.id, None)
+            self._by_status[task.status][task.id] = task
     
     async def start(self):
         """Start the execution queue and workers"""
@@ -58,6 +129,7 @@ class ExecutionQueue:
             return
         
         self.running = True
+        self._loop = asyncio.get_running_loop()
         
         # Load default executors
         await self._load_default_executors()
@@ -103,33 +175,45 @@ class ExecutionQueue:
         if command_executor:
             await command_executor.initialize()
             await command_executor.activate()
+            self._default_executor = command_executor
             logger.info("Loaded command executor")
     
     def submit_task(self, task: TaskInfo, priority: Priority = Priority.NORMAL) -> str:
-        """Submit a task to the queue"""
-        with self.queue_lock:
-            # Store task
-            self.tasks[task.id] = task
-            
-            # Add to appropriate queue
-            self.task_queues[priority.value].append(task.id)
-            
-            # Update stats
-            self.stats["total_submitted"] += 1
-            
-            logger.info(f"Task {task.id} submitted to {priority.value} queue")
-            return task.id
+        """Submit a task to the queue
+        
+        Raises QueueFullError when the priority queue already holds maxsize
+        pending tasks.
+        """
+        if self.maxsize and self._pending[priority.value] >= self.maxsize:
+            self.stats["total_rejected"] += 1
+            raise QueueFullError(
+                f"{priority.value} queue is full ({self.maxsize} pending tasks)"
+            )
+        
+        # Store task
+        self.tasks[task.id] = task
+        self._by_status[task.status][task.id] = task
+        
+        # Add to the queue; a waiting worker picks it up immediately
+        self._pq.put_nowait((_RANK[priority], next(self._seq), task.id))
+        self._queued[task.id] = priority.value
+        self._pending[priority.value] += 1
+        
+        # Update stats
+        self.stats["total_submitted"] += 1
+        
+        logger.info(f"Task {task.id} submitted to {priority.value} queue")
+        return task.id
     
-    def get_next_task(self) -> Optional[str]:
-        """Get the next task from priority queues"""
-        with self.queue_lock:
-            # Check queues in priority order
-            for priority in [Priority.URGENT, Priority.NORMAL, Priority.BATCH]:
-                queue = self.task_queues[priority.value]
-                if queue:
-                    task_id = queue.pop(0)
-                    return task_id
-            return None
+    async def get_next_task(self) -> str:
+        """Wait for the next task in priority order"""
+        while True:
+            _, _, task_id = await self._pq.get()
+            if task_id in self._cancelled:
+                self._cancelled.discard(task_id)
+                continue
+            self._pending[self._queued.pop(task_id)] -= 1
+            return task_id
     
     async def execute_task(self, task_id: str, worker_id: str) -> Dict[str, Any]:
         """Execute a task using appropriate executor module"""
@@ -139,42 +223,44 @@ class ExecutionQueue:
             return {"status": "error", "error": "Task not found"}
         
         # Update task status
-        task.status = TaskStatus.RUNNING
-        task.started_at = datetime.now()
+        self._set_status(task, TaskStatus.RUNNING)
+        task.started_at = task.updated_at = datetime.now()
         
         try:
             # Find executor that can handle this task
-            executor = await self._find_executor(task)
+            # Built once for executor selection and execution alike
+            task_dict = task.to_dict()
+            executor = await self._find_executor(task, task_dict)
             if not executor:
                 raise Exception("No executor available for task type")
             
             # Execute the task
             logger.info(f"Worker {worker_id} executing task {task_id} with {executor.id}")
             
-            result = await executor.execute_task(task.to_dict())
+            result = await executor.execute_task(task_dict)
             
             # Update task based on result
             if result.get("status") == "success":
-                task.status = TaskStatus.COMPLETED
+                self._set_status(task, TaskStatus.COMPLETED)
                 task.result = result
                 self.stats["total_completed"] += 1
-                self.stats["by_executor"][executor.id]["completed"] += 1
+                self.completed_by_executor[executor.id] += 1
             else:
-                task.status = TaskStatus.FAILED
+                self._set_status(task, TaskStatus.FAILED)
                 task.error = result.get("error", "Unknown error")
                 task.result = result
                 self.stats["total_failed"] += 1
-                self.stats["by_executor"][executor.id]["failed"] += 1
+                self.failed_by_executor[executor.id] += 1
             
-            task.completed_at = datetime.now()
+            task.completed_at = task.updated_at = datetime.now()
             
             return result
             
         except Exception as e:
             logger.error(f"Task {task_id} execution failed: {e}")
-            task.status = TaskStatus.FAILED
+            self._set_status(task, TaskStatus.FAILED)
             task.error = str(e)
-            task.completed_at = datetime.now()
+            task.completed_at = task.updated_at = datetime.now()
             self.stats["total_failed"] += 1
             
             return {
@@ -182,74 +268,126 @@ class ExecutionQueue:
                 "error": str(e)
             }
     
-    async def _find_executor(self, task: TaskInfo) -> Optional[ExecutorModule]:
-        """Find an executor module that can handle the task"""
+    async def _find_executor(
+        self, task: TaskInfo, task_dict: Dict[str, Any]
+    ) -> Optional[ExecutorModule]:
+        """Find an executor module that can handle the task
+        
+        The winning executor is remembered per task type and parameter
+        names and asked first next time, so a task of a known shape usually
+        needs one can_execute call instead of a scan over every module.
+        """
+        key = (task.type, tuple(sorted(task.parameters)))
+        executor_id = self._executor_cache.get(key)
+        if executor_id:
+            module = self.module_loader.loaded_modules.get(executor_id)
+            # Parameter values can still disqualify it, so ask it again
+            if module and module.is_active and await module.can_execute(task_dict):
+                return module
+        
+        # Try the default executor before scanning every loaded module
+        default = self._default_executor
+        if default and default.is_active and await default.can_execute(task_dict):
+            self._executor_cache[key] = default.id
+            return default
+        
         # Get all loaded executor modules
         for module_id, module in self.module_loader.get_loaded_modules().items():
             if isinstance(module, ExecutorModule) and module.is_active:
-                if await module.can_execute(task.to_dict()):
+                if await module.can_execute(task_dict):
+                    self._executor_cache[key] = module_id
                     return module
         
         return None
     
+    def _on_modules_changed(self, module_id: str):
+        """Loader listener; runs on whichever thread loaded the module"""
+        if self._loop is None:
+            # Not started yet, so no worker can be reading the cache
+            self.invalidate_executor_cache(module_id)
+        else:
+            self._loop.call_soon_threadsafe(self.invalidate_executor_cache, module_id)
+    
+    def invalidate_executor_cache(self, module_id: Optional[str] = None):
+        """Forget executor choices after modules are loaded or unloaded"""
+        self._executor_cache.clear()
+        if self._default_executor and self._default_executor.id == module_id:
+            if module_id not in self.module_loader.loaded_modules:
+                self._default_executor = None
+    
     def get_task(self, task_id: str) -> Optional[TaskInfo]:
         """Get task by ID"""
         return self.tasks.get(task_id)
     
-    def list_tasks(self, status: Optional[TaskStatus] = None, limit: int = 100) -> List[TaskInfo]:
-        """List tasks with optional filtering"""
-        tasks = list(self.tasks.values())
+    def list_tasks(
+        self,
+        status: Optional[TaskStatus] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[TaskInfo], Optional[str]]:
+        """List tasks newest first, one page at a time
         
-        if status:
-            tasks = [t for t in tasks if t.status == status]
+        Pages are keyed on (created_at, id). The returned cursor is an opaque
+        token for the last task of the page and is None when there are no more tasks.
+        Raises ValueError for a malformed cursor.
+        """
+        # A status filter only looks at that status's bucket
+        tasks = self._by_status[status].values() if status else self.tasks.values()
         
-        # Sort by created_at descending
-        tasks.sort(key=lambda t: t.created_at, reverse=True)
+        if cursor:
+            after = _parse_cursor(cursor)
+            tasks = [t for t in tasks if (t.created_at, t.id) < after]
         
-        return tasks[:limit]
+        # Newest first; one extra tells whether another page exists. nlargest
+        # keeps only limit + 1 items instead of sorting every task
+        tasks = heapq.nlargest(limit + 1, tasks, key=lambda t: (t.created_at, t.id))
+        
+        page = tasks[:limit]
+        next_cursor = None
+        if len(tasks) > limit:
+            next_cursor = _make_cursor(page[-1])
+        return page, next_cursor
     
     def cancel_task(self, task_id: str) -> bool:
         """Cancel a pending task"""
-        with self.queue_lock:
-            task = self.tasks.get(task_id)
-            if not task:
-                return False
+        task = self.tasks.get(task_id)
+        if not task:
+            return False
+        
+        if task.status == TaskStatus.PENDING:
+            # Tombstone the queue entry
+            priority = self._queued.pop(task_id, None)
+            if priority is not None:
+                self._cancelled.add(task_id)
+                self._pending[priority] -= 1
             
-            if task.status == TaskStatus.PENDING:
-                # Remove from queue
-                for priority, queue in self.task_queues.items():
-                    if task_id in queue:
-                        queue.remove(task_id)
-                        break
-                
-                # Update status
-                task.status = TaskStatus.CANCELLED
-                task.completed_at = datetime.now()
-                
-                logger.info(f"Task {task_id} cancelled")
-                return True
+            # Update status
+            self._set_status(task, TaskStatus.CANCELLED)
+            task.completed_at = task.updated_at = datetime.now()
             
-            return False
+            logger.info(f"Task {task_id} cancelled")
+            return True
+        
+        return False
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get queue statistics"""
-        with self.queue_lock:
-            queue_counts = {
-                priority: len(queue) 
-                for priority, queue in self.task_queues.items()
-            }
+        queue_counts = {
+            priority.value: self._pending[priority.value]
+            for priority in Priority
+        }
         
-        # Count tasks by status
-        status_counts = defaultdict(int)
-        for task in self.tasks.values():
-            status_counts[task.status.value] += 1
+        completed, failed = self.completed_by_executor, self.failed_by_executor
         
         # Worker status
         active_workers = len([w for w in self.workers if w.current_task])
         
         return {
             "queues": queue_counts,
-            "tasks": dict(status_counts),
+            "tasks": {
+                status.value: len(bucket)
+                for status, bucket in self._by_status.items() if bucket
+            },
             "workers": {
                 "total": len(self.workers),
                 "active": active_workers,
@@ -258,9 +396,16 @@ class ExecutionQueue:
             "totals": {
                 "submitted": self.stats["total_submitted"],
                 "completed": self.stats["total_completed"],
-                "failed": self.stats["total_failed"]
+                "failed": self.stats["total_failed"],
+                "rejected": self.stats["total_rejected"]
             },
-            "by_executor": dict(self.stats["by_executor"])
+            "by_executor": {
+                executor_id: {
+                    "completed": completed[executor_id],
+                    "failed": failed[executor_id]
+                }
+                for executor_id in completed.keys() | failed.keys()
+            }
         }
 
 class QueueWorker:
@@ -278,16 +423,12 @@ class QueueWorker:
         
         while self.running and self.queue.running:
             try:
-                # Get next task
-                task_id = self.queue.get_next_task()
+                # Wait for the next task
+                task_id = await self.queue.get_next_task()
                 
-                if task_id:
-                    self.current_task = task_id
-                    await self.queue.execute_task(task_id, self.worker_id)
-                    self.current_task = None
-                else:
-                    # No tasks, wait a bit
-                    await asyncio.sleep(0.5)
+                self.current_task = task_id
+                await self.queue.execute_task(task_id, self.worker_id)
+                self.current_task = None
                     
             except Exception as e:
                 logger.error(f"Worker {self.worker_id} error: {e}")
@@ -1,5 +1,6 @@
 """Task Manager Service"""
 import asyncio
+import heapq
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any
@@ -32,15 +33,13 @@ class TaskManager:
     
     async def list_tasks(self, status: Optional[TaskStatus] = None, limit: int = 100) -> List[TaskInfo]:
         """List tasks with optional filtering"""
-        tasks = list(self.tasks.values())
+        tasks = self.tasks.values()
         
         if status:
             tasks = [t for t in tasks if t.status == status]
         
-        # Sort by created_at descending
-        tasks.sort(key=lambda t: t.created_at, reverse=True)
-        
-        return tasks[:limit]
+        # Newest first, keeping only limit items instead of sorting them all
+        return heapq.nlargest(limit, tasks, key=lambda t: t.created_at)
     
     async def update_task(self, task_id: str, update: TaskUpdateRequest) -> Optional[TaskInfo]:
         """Update task status or result"""
@@ -49,12 +48,15 @@ class TaskManager:
             if not task:
                 return None
             
+            # One clock read per transition, shared by every timestamp it sets
+            now = datetime.now()
+            
             if update.status:
                 task.status = update.status
                 if update.status == TaskStatus.RUNNING and not task.started_at:
-                    task.started_at = datetime.now()
+                    task.started_at = now
                 elif update.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
-                    task.completed_at = datetime.now()
+                    task.completed_at = now
             
             if update.result is not None:
                 task.result = update.result
@@ -62,7 +64,7 @@ class TaskManager:
             if update.error:
                 task.error = update.error
             
-            task.updated_at = datetime.now()
+            task.updated_at = now
             
             logger.info(f"Task {task_id} updated: status={task.status}")
             return task
@@ -75,8 +77,7 @@ class TaskManager:
                 return False
             
             task.status = TaskStatus.CANCELLED
-            task.updated_at = datetime.now()
-            task.completed_at = datetime.now()
+            task.updated_at = task.completed_at = datetime.now()
             
             logger.info(f"Task {task_id} cancelled")
             return True
@@ -101,28 +102,29 @@ class TaskManager:
                 if not task or task.status != TaskStatus.PENDING:
                     continue
                 
-                # Update task status
-                await self.update_task(task_id, TaskUpdateRequest(status=TaskStatus.RUNNING))
+                # Write state directly on the task rather than through
+                # update_task: plain attribute writes with no await between
+                # them can't interleave with other coroutines, so they need
+                # neither the lock nor a log line each
+                task.status = TaskStatus.RUNNING
+                now = datetime.now()
+                if not task.started_at:
+                    task.started_at = now
+                task.updated_at = now
                 
                 # Process task based on type
                 try:
-                    result = await self._execute_task(task)
-                    await self.update_task(
-                        task_id, 
-                        TaskUpdateRequest(
-                            status=TaskStatus.COMPLETED,
-                            result=result
-                        )
-                    )
+                    task.result = await self._execute_task(task)
+                    task.status = TaskStatus.COMPLETED
                 except Exception as e:
-                    logger.error(f"Task {task_id} failed: {e}")
-                    await self.update_task(
-                        task_id,
-                        TaskUpdateRequest(
-                            status=TaskStatus.FAILED,
-                            error=str(e)
-                        )
-                    )
+                    task.error = str(e)
+                    task.status = TaskStatus.FAILED
+                
+                task.completed_at = task.updated_at = datetime.now()
+                if task.status == TaskStatus.FAILED:
+                    logger.error(f"Task {task_id} failed: {task.error}")
+                else:
+                    logger.info(f"Task {task_id} completed")
                 
             except asyncio.TimeoutError:
                 # No tasks in queue, continue
@@ -152,10 +154,15 @@ class TaskManager:
         logger.info("Shutting down task manager")
         self.running = False
         
-        # Cancel remaining tasks
-        while not self.task_queue.empty():
-            try:
-                task_id = self.task_queue.get_nowait()
-                await self.cancel_task(task_id)
-            except asyncio.QueueEmpty:
-                break
+        # Cancel remaining tasks in one pass and drop the queue wholesale
+        async with self.lock:
+            now = datetime.now()
+            cancelled = 0
+            for task in self.tasks.values():
+                if task.status == TaskStatus.PENDING:
+                    task.status = TaskStatus.CANCELLED
+                    task.updated_at = task.completed_at = now
+                    cancelled += 1
+            self.task_queue = asyncio.Queue()
+        
+        logger.info(f"Cancelled {cancelled} pending tasks on shutdown")
@@ -2,13 +2,39 @@
 """
 Test output capture after fix
 """
-import json
+import http.client
 import time
-import urllib.request
+
+import orjson
 
 print("Testing Nexus_3 output capture fix...")
 print("=" * 50)
 
+# One keep-alive connection for every request
+conn = http.client.HTTPConnection("localhost", 8100)
+
+def request(method, path, body=None):
+    """Send a request over the shared connection and decode the JSON reply"""
+    if body is None:
+        conn.request(method, path)
+    else:
+        conn.request(method, path, orjson.dumps(body), {"Content-Type": "application/json"})
+    return orjson.loads(conn.getresponse().read())
+
+def wait_for(task_id, timeout=5.0):
+    """Poll a task with exponential backoff until it finishes or timeout passes"""
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    while True:
+        task_result = request("GET", f"/tasks/{task_id}")
+        if task_result['status'] in ['completed', 'failed']:
+            return task_result
+        if time.monotonic() >= deadline:
+            return None
+        print(".", end="", flush=True)
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
 # Simple echo test
 task = {
     "type": "generation",
@@ -22,17 +48,10 @@ task = {
 }
 
 # Submit task
-req = urllib.request.Request(
-    "http://localhost:8100/tasks",
-    data=json.dumps(task).encode(),
-    headers={'Content-Type': 'application/json'}
-)
-
 try:
-    with urllib.request.urlopen(req) as r:
-        result = json.loads(r.read())
-        task_id = result['id']
-        print(f"Task created: {task_id}")
+    result = request("POST", "/tasks", task)
+    task_id = result['id']
+    print(f"Task created: {task_id}")
 except Exception as e:
     print(f"Error creating task: {e}")
     print("Make sure Nexus_3 is running on port 8100")
@@ -40,29 +59,23 @@ except Exception as e:
 
 # Wait for completion
 print("Waiting for result", end="", flush=True)
-for i in range(5):
-    time.sleep(1)
-    print(".", end="", flush=True)
+task_result = wait_for(task_id)
 
-    with urllib.request.urlopen(f"http://localhost:8100/tasks/{task_id}") as r:
-        task_result = json.loads(r.read())
-        
-        if task_result['status'] in ['completed', 'failed']:
-            print(f"\n\nStatus: {task_result['status']}")
-            
-            result = task_result.get('result', {})
-            
-            # Check if we have real output now
-            if isinstance(result, dict) and 'stdout' in result:
-                print("✅ OUTPUT CAPTURE FIXED!")
-                print(f"Exit code: {result.get('exit_code', 'N/A')}")
-                print(f"Stdout: {result['stdout'].strip()}")
-                if result.get('stderr'):
-                    print(f"Stderr: {result['stderr'].strip()}")
-            else:
-                print("❌ Still returning mock results")
-                print(f"Result: {json.dumps(result, indent=2)}")
-            break
+if task_result:
+    print(f"\n\nStatus: {task_result['status']}")
+
+    result = task_result.get('result', {})
+
+    # Check if we have real output now
+    if isinstance(result, dict) and 'stdout' in result:
+        print("✅ OUTPUT CAPTURE FIXED!")
+        print(f"Exit code: {result.get('exit_code', 'N/A')}")
+        print(f"Stdout: {result['stdout'].strip()}")
+        if result.get('stderr'):
+            print(f"Stderr: {result['stderr'].strip()}")
+    else:
+        print("❌ Still returning mock results")
+        print(f"Result: {orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()}")
 
 print("\n" + "=" * 50)
 
@@ -79,24 +92,16 @@ task2 = {
     "priority": 10
 }
 
-req2 = urllib.request.Request(
-    "http://localhost:8100/tasks",
-    data=json.dumps(task2).encode(),
-    headers={'Content-Type': 'application/json'}
-)
-
-with urllib.request.urlopen(req2) as r:
-    result2 = json.loads(r.read())
-    task_id2 = result2['id']
-
-time.sleep(2)
-
-with urllib.request.urlopen(f"http://localhost:8100/tasks/{task_id2}") as r:
-    task_result2 = json.loads(r.read())
-    result2 = task_result2.get('result', {})
-    
-    if result2.get('stdout'):
-        print("✅ Python output captured:")
-        print(result2['stdout'])
-    else:
-        print("❌ No Python output")
+result2 = request("POST", "/tasks", task2)
+task_id2 = result2['id']
+
+task_result2 = wait_for(task_id2) or {}
+result2 = task_result2.get('result') or {}
+
+if result2.get('stdout'):
+    print("✅ Python output captured:")
+    print(result2['stdout'])
+else:
+    print("❌ No Python output")
+
+conn.close()